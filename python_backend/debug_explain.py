@@ -1,14 +1,27 @@
 
 import pandas as pd
 import numpy as np
-import shap
 from sklearn.model_selection import train_test_split
 from sklearn.linear_model import LogisticRegression
-from sklearn.preprocessing import LabelEncoder
-import io
+from sklearn.preprocessing import StandardScaler
+import hashlib
+import os
+import pathlib
+import re
+import joblib
 import warnings
 warnings.filterwarnings("ignore")
 
+# Identifier columns are dropped from the features ('id' unless part of a safe word)
+IDENTIFIER_RE = re.compile(r'name|email|phone', re.I)
+ID_RE = re.compile(r'id', re.I)
+ID_SAFE_RE = re.compile(r'valid|video|acid|fluid', re.I)
+
+# Trained models keyed by the md5 of the data file and the pipeline version;
+# bump CACHE_VERSION whenever preprocessing, encoding, scaling or the solver changes
+CACHE_DIR = pathlib.Path('.cache')
+CACHE_VERSION = 'v2'
+
 def detect_columns_debug(df):
     columns = df.columns.tolist()
     target_col = None
@@ -30,15 +43,26 @@ def detect_columns_debug(df):
 
 def run_debug():
     print("Loading csv...")
+    # Prefer the Parquet copy written by generate_indian_data.py (no CSV parse),
+    # unless the CSV has been edited or replaced since
+    data_path = 'indian_loans.csv'
+    if os.path.exists('indian_loans.parquet') and (
+        not os.path.exists(data_path)
+        or os.path.getmtime('indian_loans.parquet') >= os.path.getmtime(data_path)
+    ):
+        data_path = 'indian_loans.parquet'
     try:
-        df = pd.read_csv('indian_loans.csv')
+        # Arrow-backed dtypes keep string columns columnar instead of Python objects
+        if data_path.endswith('.parquet'):
+            df = pd.read_parquet(data_path, dtype_backend='pyarrow')
+        else:
+            df = pd.read_csv(data_path, engine='pyarrow', dtype_backend='pyarrow')
     except:
-        print("Could not read indian_loans.csv")
+        print(f"Could not read {data_path}")
         return
     
     print(f"Columns: {df.columns.tolist()}")
     
-    df = df.dropna()
     target, protected = detect_columns_debug(df)
     
     if not target:
@@ -48,26 +72,26 @@ def run_debug():
         
     print(f"Target: {target}, Protected: {protected}")
 
+    # Only rows missing the label or group are unusable; impute numeric features instead
+    df.dropna(subset=[target, protected], inplace=True)
+    df.fillna(df.median(numeric_only=True), inplace=True)
+
     # Encode categorical data
-    label_encoders = {}
-    for col in df.columns:
-        if df[col].dtype == 'object' or df[col].dtype.name == 'category':
-            le = LabelEncoder()
-            df[col] = le.fit_transform(df[col].astype(str))
-            label_encoders[col] = le
+    obj_cols = df.select_dtypes(include=['object', 'category', 'string']).columns
+    if len(obj_cols):
+        df[obj_cols] = df[obj_cols].apply(lambda s: pd.factorize(s, sort=True)[0].astype(np.int32))
 
     # Drop Identifier Columns 
     cols_to_drop = [target]
     for col in df.columns:
-        col_lower = col.lower()
-        if any(keyword in col_lower for keyword in ['name', 'email', 'phone']):
-            if col != target and col != protected:
-                cols_to_drop.append(col)
-                print(f"Dropping identifier: {col}")
-        elif 'id' in col_lower and not any(safe in col_lower for safe in ['valid', 'video', 'acid', 'fluid']):
-            if col != target and col != protected:
-                cols_to_drop.append(col)
-                print(f"Dropping ID column: {col}")
+        if col == target or col == protected:
+            continue
+        if IDENTIFIER_RE.search(col):
+            cols_to_drop.append(col)
+            print(f"Dropping identifier: {col}")
+        elif ID_RE.search(col) and not ID_SAFE_RE.search(col):
+            cols_to_drop.append(col)
+            print(f"Dropping ID column: {col}")
 
     # 2. Train model
     try:
@@ -84,57 +108,56 @@ def run_debug():
     feature_names = list(X.columns)
     print(f"Feature names (Length {len(feature_names)}): {feature_names}")
 
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    # float32 halves the bytes the solver and SHAP step stream through
+    X_train, X_test, y_train, _ = train_test_split(
+        X.to_numpy(dtype=np.float32), y, test_size=0.2, random_state=42
+    )
+
+    # Reuse the trained model while the input file is unchanged
+    data_hash = hashlib.md5(pathlib.Path(data_path).read_bytes()).hexdigest()
+    cache_file = CACHE_DIR / f"{data_hash}-{CACHE_VERSION}.joblib"
+    if cache_file.exists():
+        print(f"Loading cached model: {cache_file}")
+        scaler, model, mean_x, feature_names = joblib.load(cache_file)
+        X_test = scaler.transform(X_test)
+    else:
+        # Standardize so the solver converges in a handful of iterations
+        scaler = StandardScaler()
+        X_train = scaler.fit_transform(X_train)
+        X_test = scaler.transform(X_test)
+
+        # liblinear is fastest on small binary data (it rejects multiclass targets);
+        # saga scales better to large n
+        if len(X_train) > 10000:
+            model = LogisticRegression(solver='saga', max_iter=200)
+        elif y_train.nunique() > 2:
+            model = LogisticRegression(solver='lbfgs', max_iter=200)
+        else:
+            model = LogisticRegression(solver='liblinear', max_iter=200)
+        model.fit(X_train, y_train)
 
-    model = LogisticRegression(max_iter=1000)
-    model.fit(X_train, y_train)
+        mean_x = X_train.mean(axis=0)
+        CACHE_DIR.mkdir(exist_ok=True)
+        joblib.dump((scaler, model, mean_x, feature_names), cache_file)
 
     # 3. SHAP Analysis
+    # For a linear model the exact SHAP value is coef * (x - E[x]), so skip the explainer
     print("Computing SHAP...")
-    explainer = shap.LinearExplainer(model, X_train)
-    shap_values = explainer.shap_values(X_test)
-    
-    # SHAPE DEBUGGING
-    if isinstance(shap_values, list):
-        print(f"shap_values is list of length {len(shap_values)}")
-        shap_values = np.array(shap_values[1]) if len(shap_values) > 1 else np.array(shap_values[0])
-    
-    shap_values = np.array(shap_values)
-    print(f"shap_values shape: {shap_values.shape}")
-    
-    if len(shap_values.shape) > 1:
-        mean_abs_shap = np.abs(shap_values).mean(axis=0)
-    else:
-        mean_abs_shap = np.abs(shap_values)
-        
+    contrib = (X_test - mean_x) * model.coef_[0]
+    mean_abs_shap = np.abs(contrib).mean(axis=0)
     print(f"mean_abs_shap shape: {mean_abs_shap.shape} (Length: {len(mean_abs_shap)})")
     
-    mean_abs_shap = mean_abs_shap.flatten()
-    print(f"Flattened mean_abs_shap shape: {mean_abs_shap.shape}")
-    
     print(f"Match? {len(feature_names)} == {len(mean_abs_shap)}")
 
-    top_5_indices = np.argsort(mean_abs_shap)[-5:][::-1].flatten().tolist()
-    print(f"top_5_indices: {top_5_indices}")
+    k = min(5, len(mean_abs_shap))
+    top = np.argpartition(mean_abs_shap, -k)[-k:]
+    top_5_indices = top[np.argsort(-mean_abs_shap[top])]
+    print(f"top_5_indices: {top_5_indices.tolist()}")
 
-    feature_importance = []
-    for idx in top_5_indices:
-        # Safe handling
-        if isinstance(idx, (list, tuple, np.ndarray)):
-            idx = int(idx[0])
-        else:
-            idx = int(idx)
-            
-        print(f"Processing index {idx}...")
-        if idx < len(feature_names):
-            val = mean_abs_shap[idx]
-            importance_value = val.item() if hasattr(val, 'item') else float(val)
-            feature_importance.append({
-                "feature": str(feature_names[idx]),
-                "importance": round(importance_value, 4)
-            })
-        else:
-            print(f"Index {idx} OUT OF BOUNDS. Max: {len(feature_names)}")
+    feature_importance = [
+        {"feature": str(feature_names[i]), "importance": round(float(mean_abs_shap[i]), 4)}
+        for i in top_5_indices
+    ]
 
     print(f"Result: {feature_importance}")
 
@@ -1,84 +1,93 @@
 
 import pandas as pd
 import numpy as np
-import random
 import os
+import zlib
+import pyarrow as pa
+import pyarrow.csv as pv
+import pyarrow.parquet as pq
+from joblib import Parallel, delayed
 
 # Create output directory
 output_dir = "testing_datasets"
 os.makedirs(output_dir, exist_ok=True)
 
 def generate_base_data(n_samples=1000):
-    np.random.seed(42)
+    rng = np.random.default_rng(42)
+    # Age, Dependents, Income (monthly, INR), Loan_Amount, Credit_Score, Months_Employed in one draw
+    ints = rng.integers(
+        [21, 0, 20000, 50000, 300, 0],
+        [70, 5, 200000, 5000000, 900, 360],
+        size=(n_samples, 6)
+    )
     data = {
         'Applicant_Name': [f"Applicant_{i}" for i in range(1, n_samples + 1)],
-        'Age': np.random.randint(21, 70, n_samples),
-        'Gender': np.random.choice(['Male', 'Female'], n_samples, p=[0.6, 0.4]),
-        'Marital_Status': np.random.choice(['Single', 'Married', 'Divorced'], n_samples),
-        'Dependents': np.random.randint(0, 5, n_samples),
-        'Income': np.random.randint(20000, 200000, n_samples), # Monthly income in INR
-        'Loan_Amount': np.random.randint(50000, 5000000, n_samples),
-        'Credit_Score': np.random.randint(300, 900, n_samples),
-        'Months_Employed': np.random.randint(0, 360, n_samples),
-        'Caste_Category': np.random.choice(['General', 'OBC', 'SC', 'ST'], n_samples, p=[0.4, 0.3, 0.2, 0.1]),
-        'Religion': np.random.choice(['Hindu', 'Muslim', 'Christian', 'Sikh', 'Other'], n_samples, p=[0.7, 0.15, 0.05, 0.05, 0.05])
+        'Age': ints[:, 0],
+        'Gender': rng.choice(['Male', 'Female'], n_samples, p=[0.6, 0.4]),
+        'Marital_Status': rng.choice(['Single', 'Married', 'Divorced'], n_samples),
+        'Dependents': ints[:, 1],
+        'Income': ints[:, 2],
+        'Loan_Amount': ints[:, 3],
+        'Credit_Score': ints[:, 4],
+        'Months_Employed': ints[:, 5],
+        'Caste_Category': rng.choice(['General', 'OBC', 'SC', 'ST'], n_samples, p=[0.4, 0.3, 0.2, 0.1]),
+        'Religion': rng.choice(['Hindu', 'Muslim', 'Christian', 'Sikh', 'Other'], n_samples, p=[0.7, 0.15, 0.05, 0.05, 0.05])
     }
     return pd.DataFrame(data)
 
-def apply_approval_logic(df, logic_fn, noise_level=0.05):
+def save_dataset(df, name):
+    """Writes the CSV and a zstd Parquet copy of it via Arrow."""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    path = os.path.join(output_dir, name)
+    pv.write_csv(table, path)
+    pq.write_table(table, os.path.splitext(path)[0] + ".parquet", compression="zstd")
+
+def apply_approval_logic(df, logic_fn, rng, noise_level=0.05):
     """Applies approval logic with some noise."""
-    approvals = []
-    for _, row in df.iterrows():
-        base_approved = logic_fn(row)
-        # Add noise (random flip)
-        if random.random() < noise_level:
-            base_approved = not base_approved
-        approvals.append(1 if base_approved else 0)
-    df['Loan_Approved'] = approvals
+    approved = logic_fn(df)
+    # Add noise (random flip)
+    noise = rng.random(len(df)) < noise_level
+    df['Loan_Approved'] = (approved ^ noise).astype(np.int8)
     return df
 
 # 1. Bias: Gender (Women rejected more often)
-def logic_gender_bias(row):
+def logic_gender_bias(df):
     # Strong bias against Female
-    if row['Gender'] == 'Female':
-        return row['Credit_Score'] > 750 and row['Income'] > 80000
-    else:
-        return row['Credit_Score'] > 600
+    female = df['Gender'].values == 'Female'
+    credit = df['Credit_Score'].values
+    income = df['Income'].values
+    return (female & (credit > 750) & (income > 80000)) | (~female & (credit > 600))
 
 # 2. Bias: Caste (SC/ST rejected more often)
-def logic_caste_bias(row):
-    if row['Caste_Category'] in ['SC', 'ST']:
-        return row['Credit_Score'] > 800
-    else:
-        return row['Credit_Score'] > 650
+def logic_caste_bias(df):
+    reserved = np.isin(df['Caste_Category'].values, ['SC', 'ST'])
+    credit = df['Credit_Score'].values
+    return np.where(reserved, credit > 800, credit > 650)
 
 # 3. Fair / Balanced (Only Credit Score & Income matter)
-def logic_balanced(row):
+def logic_balanced(df):
     # Healthy DTI ratio proxy
-    ratio = row['Loan_Amount'] / (row['Income'] * 12)
-    return row['Credit_Score'] > 700 and ratio < 5
+    ratio = df['Loan_Amount'].values / (df['Income'].values * 12)
+    return (df['Credit_Score'].values > 700) & (ratio < 5)
 
 # 4. Bias: Age (Elderly rejected)
-def logic_age_bias(row):
-    if row['Age'] > 55:
-        return False
-    return row['Credit_Score'] > 650
+def logic_age_bias(df):
+    return (df['Age'].values <= 55) & (df['Credit_Score'].values > 650)
 
 # 5. Bias: Income (Rich rejected - Anomaly)
-def logic_income_reverse(row):
-    if row['Income'] > 150000:
-        return False # Suspicious?
-    return row['Credit_Score'] > 600
+def logic_income_reverse(df):
+    # Suspicious?
+    return (df['Income'].values <= 150000) & (df['Credit_Score'].values > 600)
 
 # 6. Strict Credit Score (Fair but harsh)
-def logic_strict_credit(row):
-    return row['Credit_Score'] > 800
+def logic_strict_credit(df):
+    return df['Credit_Score'].values > 800
 
 # 7. Bias: Religion (Minority bias)
-def logic_religion_bias(row):
-    if row['Religion'] == 'Muslim':
-        return row['Credit_Score'] > 850
-    return row['Credit_Score'] > 650
+def logic_religion_bias(df):
+    muslim = df['Religion'].values == 'Muslim'
+    credit = df['Credit_Score'].values
+    return np.where(muslim, credit > 850, credit > 650)
 
 # 8. Small Dataset
 # (Logic: Balanced)
@@ -103,20 +112,33 @@ datasets = [
     ("9_large_dataset.csv", logic_balanced, 5000),
 ]
 
-for name, logic, size in datasets:
-    df = generate_base_data(size)
-    df = apply_approval_logic(df, logic)
-    df.to_csv(os.path.join(output_dir, name), index=False)
+def dataset_rng(name):
+    # Per-dataset noise seed, stable across worker processes (unlike hash())
+    return np.random.default_rng(zlib.crc32(name.encode()))
+
+def make_one(name, logic, base):
+    df = apply_approval_logic(base.copy(), logic, dataset_rng(name))
+    save_dataset(df, name)
+    return name
+
+# Base columns depend only on size (fixed seed), so build each size once
+bases = {size: generate_base_data(size) for size in {s for _, _, s in datasets}}
+
+# Datasets are independent, so fan them out across cores
+for name in Parallel(n_jobs=-1, backend='loky')(delayed(make_one)(n, l, bases[s]) for n, l, s in datasets):
     print(f"Generated {name}")
 
 # 10. Missing Values
-df_missing = generate_base_data(1000)
-df_missing = apply_approval_logic(df_missing, logic_balanced)
-# Introduce NaNs
-for col in ['Income', 'Age', 'Credit_Score']:
-    mask = np.random.choice([True, False], size=1000, p=[0.1, 0.9])
-    df_missing.loc[mask, col] = np.nan
-df_missing.to_csv(os.path.join(output_dir, "10_missing_values.csv"), index=False)
+rng = dataset_rng("10_missing_values.csv")
+df_missing = bases[1000].copy()
+df_missing = apply_approval_logic(df_missing, logic_balanced, rng)
+# Introduce NaNs (~10% per column, one uniform draw for all three)
+holes = rng.random((len(df_missing), 3)) < 0.1
+for i, col in enumerate(['Income', 'Age', 'Credit_Score']):
+    arr = df_missing[col].to_numpy(dtype=float)
+    arr[holes[:, i]] = np.nan
+    df_missing[col] = arr
+save_dataset(df_missing, "10_missing_values.csv")
 print("Generated 10_missing_values.csv")
 
 print(f"All 10 datasets generated in {output_dir}/")
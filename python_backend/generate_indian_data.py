@@ -1,10 +1,11 @@
 import pandas as pd
 import numpy as np
-import random
+import pyarrow as pa
+import pyarrow.csv as pv
+import pyarrow.parquet as pq
 
 # Seed for reproducibility
 np.random.seed(42)
-random.seed(42)
 
 # Indian names database
 first_names = [
@@ -25,14 +26,6 @@ last_names = [
 # Generate 1000 rows
 n_rows = 1000
 
-data = {
-    "Applicant_Name": [],
-    "Caste_Category": [],
-    "Religion": [],
-    "Credit_Score": [],
-    "Loan_Approved": []
-}
-
 # Distribution weightings
 caste_categories = ["General", "SC", "ST", "OBC"]
 caste_weights = [0.35, 0.25, 0.15, 0.25]
@@ -40,67 +33,63 @@ caste_weights = [0.35, 0.25, 0.15, 0.25]
 religions = ["Hindu", "Muslim", "Sikh", "Christian"]
 religion_weights = [0.60, 0.20, 0.10, 0.10]
 
-for i in range(n_rows):
-    # Generate name
-    first = random.choice(first_names)
-    last = random.choice(last_names)
-    name = f"{first} {last}"
-    
-    # Generate caste and religion
-    caste = np.random.choice(caste_categories, p=caste_weights)
-    religion = np.random.choice(religions, p=religion_weights)
-    
-    # Generate credit score (300-850 range, like CIBIL)
-    credit_score = np.random.randint(300, 851)
-    
-    # BIAS INJECTION LOGIC
-    # Base approval probability based on credit score
-    if credit_score >= 750:
-        base_approval_prob = 0.90
-    elif credit_score >= 650:
-        base_approval_prob = 0.70
-    elif credit_score >= 550:
-        base_approval_prob = 0.40
-    else:
-        base_approval_prob = 0.15
-    
-    # Apply bias: Reduce approval rate for SC/ST and Muslim
-    if caste in ["SC", "ST"]:
-        base_approval_prob -= 0.15  # 15% penalty
-    
-    if religion == "Muslim":
-        base_approval_prob -= 0.15  # 15% penalty
-    
-    # Ensure probability stays in [0, 1]
-    base_approval_prob = max(0, min(1, base_approval_prob))
-    
-    # Determine approval
-    loan_approved = 1 if np.random.random() < base_approval_prob else 0
-    
-    # Add to data
-    data["Applicant_Name"].append(name)
-    data["Caste_Category"].append(caste)
-    data["Religion"].append(religion)
-    data["Credit_Score"].append(credit_score)
-    data["Loan_Approved"].append(loan_approved)
-
-# Create DataFrame
-df = pd.DataFrame(data)
-
-# Save to CSV
+# Generate names (draw indices, then gather and join in one pass)
+fn_idx = np.random.randint(0, len(first_names), n_rows)
+ln_idx = np.random.randint(0, len(last_names), n_rows)
+first = np.array(first_names)[fn_idx]
+last = np.array(last_names)[ln_idx]
+names = np.char.add(np.char.add(first, " "), last)
+
+# Generate caste and religion
+caste = np.random.choice(caste_categories, n_rows, p=caste_weights)
+religion = np.random.choice(religions, n_rows, p=religion_weights)
+
+# Generate credit score (300-850 range, like CIBIL)
+credit_score = np.random.randint(300, 851, n_rows, dtype=np.int16)
+
+# BIAS INJECTION LOGIC
+# Base approval probability based on credit score
+base_approval_prob = np.select(
+    [credit_score >= 750, credit_score >= 650, credit_score >= 550],
+    [0.90, 0.70, 0.40],
+    default=0.15
+)
+
+# Apply bias: Reduce approval rate for SC/ST and Muslim
+base_approval_prob -= 0.15 * np.isin(caste, ["SC", "ST"])  # 15% penalty
+base_approval_prob -= 0.15 * (religion == "Muslim")  # 15% penalty
+
+# Ensure probability stays in [0, 1]
+np.clip(base_approval_prob, 0, 1, out=base_approval_prob)
+
+# Determine approval
+loan_approved = (np.random.random(n_rows) < base_approval_prob).astype(np.int8)
+
+# Create DataFrame straight from the typed column arrays
+df = pd.DataFrame({
+    "Applicant_Name": names,
+    "Caste_Category": caste,
+    "Religion": religion,
+    "Credit_Score": credit_score,
+    "Loan_Approved": loan_approved
+})
+
+# Save to CSV (plus a Parquet copy for faster reloads)
 output_file = "indian_loans.csv"
-df.to_csv(output_file, index=False)
+table = pa.Table.from_pandas(df, preserve_index=False)
+pv.write_csv(table, output_file)
+pq.write_table(table, "indian_loans.parquet", compression="zstd")
 
 print(f"✅ Generated {n_rows} rows of Indian loan data")
 print(f"📄 Saved to: {output_file}")
 print("\nDataset Summary:")
 print(df.head(10))
 print("\nApproval Rates by Caste Category:")
-for caste in caste_categories:
-    rate = df[df['Caste_Category'] == caste]['Loan_Approved'].mean()
+caste_rates = df.groupby('Caste_Category', sort=False)['Loan_Approved'].mean()
+for caste, rate in caste_rates.reindex(caste_categories).items():
     print(f"  {caste}: {rate*100:.1f}%")
 
 print("\nApproval Rates by Religion:")
-for rel in religions:
-    rate = df[df['Religion'] == rel]['Loan_Approved'].mean()
+religion_rates = df.groupby('Religion', sort=False)['Loan_Approved'].mean()
+for rel, rate in religion_rates.reindex(religions).items():
     print(f"  {rel}: {rate*100:.1f}%")
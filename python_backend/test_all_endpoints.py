@@ -3,6 +3,9 @@ import json
 
 url_base = "http://127.0.0.1:8000"
 
+# One keep-alive connection shared by all tests
+session = requests.Session()
+
 print("="*80)
 print("TESTING ALL ENDPOINTS")
 print("="*80)
@@ -15,7 +18,7 @@ print("="*80)
 with open("test_hiring.csv", "rb") as f:
     files = {"file": ("test_hiring.csv", f, "text/csv")}
     
-    response = requests.post(f"{url_base}/explain", files=files)
+    response = session.post(f"{url_base}/explain", files=files)
     
     if response.status_code == 200:
         result = response.json()
@@ -39,7 +42,7 @@ print("="*80)
 with open("test_hiring.csv", "rb") as f:
     files = {"file": ("test_hiring.csv", f, "text/csv")}
     
-    response = requests.post(f"{url_base}/mitigate", files=files)
+    response = session.post(f"{url_base}/mitigate", files=files)
     
     if response.status_code == 200:
         result = response.json()
@@ -72,7 +75,7 @@ data = {
     "company_name": "BiasBusterr Demo Corp"
 }
 
-response = requests.post(f"{url_base}/generate_certificate", data=data)
+response = session.post(f"{url_base}/generate_certificate", data=data)
 
 if response.status_code == 200:
     print(f"\n✅ Success!")
@@ -2,12 +2,13 @@ import requests
 
 # Test Python backend directly
 url = "http://127.0.0.1:8000/process_csv"
+session = requests.Session()
 
 with open("indian_loans.csv", "rb") as f:
     files = {"file": ("indian_loans.csv", f, "text/csv")}
     
     try:
-        response = requests.post(url, files=files)
+        response = session.post(url, files=files)
         print(f"Status Code: {response.status_code}")
         
         if response.ok:
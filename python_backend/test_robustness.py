@@ -1,23 +1,74 @@
-import requests
+import asyncio
+import httpx
 import io
-import pandas as pd
 
 url_base = "http://127.0.0.1:8000"
 
+# Test 2 payload: The "Singularity" - All rows identical
+SINGULARITY_CSV = b"gender,age,outcome\n" + b"Male,30,1\n" * 10
+
+# Test 3 payload: Missing Columns (no target column!)
+MISSING_COL_CSV = (
+    b"gender,age\n"
+    b"Male,25\nFemale,30\nMale,35\nFemale,40\nMale,45\n"
+    b"Female,25\nMale,30\nFemale,35\nMale,40\nFemale,45\n"
+)
+
+
+async def post_csv(client, filename, payload, data=None):
+    files = {"file": (filename, payload, "text/csv")}
+    return await client.post(f"{url_base}/process_csv", files=files, data=data)
+
+
+async def run_indian_loans(client):
+    with open("indian_loans.csv", "rb") as f:
+        content = f.read()
+    data = {
+        "target_column": "Loan_Approved",
+        "protected_attribute": "Caste_Category"
+    }
+    response = await post_csv(client, "indian_loans.csv", content, data)
+
+    # The compliance check needs the metrics from the first response
+    compliance_response = None
+    if response.status_code == 200:
+        result = response.json()
+        compliance_data = {
+            "disparate_impact": result['details']['disparate_impact'],
+            "demographic_parity_difference": result['details']['demographic_parity_difference'],
+            "protected_attribute": "Caste_Category"
+        }
+        compliance_response = await client.post(f"{url_base}/check_rbi_compliance", data=compliance_data)
+    return response, compliance_response
+
+
+async def run_all():
+    # The four tests are independent, so send them concurrently over one pooled client
+    async with httpx.AsyncClient(timeout=120) as client:
+        return await asyncio.gather(
+            post_csv(client, "empty.csv", io.BytesIO(b'')),
+            post_csv(client, "singularity.csv", io.BytesIO(SINGULARITY_CSV)),
+            post_csv(client, "missing_columns.csv", io.BytesIO(MISSING_COL_CSV)),
+            run_indian_loans(client),
+            return_exceptions=True
+        )
+
+
 print("="*80)
 print("ROBUSTNESS TESTING SUITE")
 print("="*80)
 
+empty_result, singularity_result, missing_result, indian_result = asyncio.run(run_all())
+
 # Test 1: Empty File
 print("\n" + "="*80)
 print("TEST 1: Empty File (0 bytes)")
 print("="*80)
 
-empty_file = io.BytesIO(b'')
-files = {"file": ("empty.csv", empty_file, "text/csv")}
-
-try:
-    response = requests.post(f"{url_base}/process_csv", files=files)
+if isinstance(empty_result, Exception):
+    print(f"❌ Connection error: {str(empty_result)}")
+else:
+    response = empty_result
     print(f"Status Code: {response.status_code}")
     if response.status_code == 400:
         print(f"✅ PASS - Server returned HTTP 400 (Bad Request)")
@@ -27,28 +78,16 @@ try:
         print(f"Response: {response.text}")
     else:
         print(f"⚠️  Unexpected status code: {response.status_code}")
-except Exception as e:
-    print(f"❌ Connection error: {str(e)}")
 
 # Test 2: The "Singularity" - All rows identical
 print("\n" + "="*80)
 print("TEST 2: The Singularity (All rows identical)")
 print("="*80)
 
-singularity_data = {
-    "gender": ["Male"] * 10,
-    "age": [30] * 10,
-    "outcome": [1] * 10
-}
-singularity_df = pd.DataFrame(singularity_data)
-singularity_csv = io.BytesIO()
-singularity_df.to_csv(singularity_csv, index=False)
-singularity_csv.seek(0)
-
-files = {"file": ("singularity.csv", singularity_csv, "text/csv")}
-
-try:
-    response = requests.post(f"{url_base}/process_csv", files=files)
+if isinstance(singularity_result, Exception):
+    print(f"❌ Connection error: {str(singularity_result)}")
+else:
+    response = singularity_result
     print(f"Status Code: {response.status_code}")
     if response.status_code == 400:
         print(f"✅ PASS - Server returned HTTP 400 (Bad Request)")
@@ -59,28 +98,16 @@ try:
     else:
         print(f"Status: {response.status_code}")
         print(f"Response: {response.json()}")
-except Exception as e:
-    print(f"❌ Connection error: {str(e)}")
 
 # Test 3: Missing Columns
 print("\n" + "="*80)
 print("TEST 3: Missing Target Column")
 print("="*80)
 
-missing_col_data = {
-    "gender": ["Male", "Female"] * 5,
-    "age": [25, 30, 35, 40, 45] * 2
-    # No target column!
-}
-missing_df = pd.DataFrame(missing_col_data)
-missing_csv = io.BytesIO()
-missing_df.to_csv(missing_csv, index=False)
-missing_csv.seek(0)
-
-files = {"file": ("missing_columns.csv", missing_csv, "text/csv")}
-
-try:
-    response = requests.post(f"{url_base}/process_csv", files=files)
+if isinstance(missing_result, Exception):
+    print(f"❌ Connection error: {str(missing_result)}")
+else:
+    response = missing_result
     print(f"Status Code: {response.status_code}")
     if response.status_code == 400:
         print(f"✅ PASS - Server returned HTTP 400 (Bad Request)")
@@ -91,65 +118,47 @@ try:
     else:
         print(f"⚠️  Unexpected status code: {response.status_code}")
         print(f"Response: {response.json()}")
-except Exception as e:
-    print(f"❌ Connection error: {str(e)}")
 
 # Test 4: Test with Indian Loans Data
 print("\n" + "="*80)
 print("TEST 4: Real Indian Loans Dataset (Positive Test)")
 print("="*80)
 
-try:
-    with open("indian_loans.csv", "rb") as f:
-        files = {"file": ("indian_loans.csv", f, "text/csv")}
-        data = {
-            "target_column": "Loan_Approved",
-            "protected_attribute": "Caste_Category"
-        }
-        
-        response = requests.post(f"{url_base}/process_csv", files=files, data=data)
-        
-        if response.status_code == 200:
-            result = response.json()
-            print(f"✅ SUCCESS - Processed Indian dataset")
-            print(f"\nFairness Score: {result['fairness_score']}")
-            print(f"Accuracy: {result['accuracy']}")
-            print(f"Disparate Impact: {result['details']['disparate_impact']}")
-            print(f"Demographic Parity: {result['details']['demographic_parity_difference']}")
-            
-            # Now test RBI compliance with this data
-            print("\n" + "-"*60)
-            print("Running RBI Compliance Check...")
-            print("-"*60)
-            
-            compliance_data = {
-                "disparate_impact": result['details']['disparate_impact'],
-                "demographic_parity_difference": result['details']['demographic_parity_difference'],
-                "protected_attribute": "Caste_Category"
-            }
-            
-            compliance_response = requests.post(f"{url_base}/check_rbi_compliance", data=compliance_data)
-            
-            if compliance_response.status_code == 200:
-                compliance = compliance_response.json()
-                print(f"\n📋 Overall Status: {compliance['overall_status']}")
-                print(f"🚨 Risk Level: {compliance['risk_level']}")
-                
-                for check in compliance['compliance_checks']:
-                    print(f"\n  ✓ {check['regulation']}:")
-                    print(f"    Status: {check['status']}")
-                    print(f"    {check['details']}")
-                
-                if 'financial_impact' in compliance:
-                    print(f"\n💰 Financial Impact:")
-                    print(f"    Estimated Penalty: {compliance['financial_impact']['estimated_penalty']}")
-        else:
-            print(f"❌ Error: {response.status_code}")
-            print(response.text[:200])
-except FileNotFoundError:
+if isinstance(indian_result, FileNotFoundError):
     print("❌ indian_loans.csv not found. Run generate_indian_data.py first.")
-except Exception as e:
-    print(f"❌ Error: {str(e)}")
+elif isinstance(indian_result, Exception):
+    print(f"❌ Error: {str(indian_result)}")
+else:
+    response, compliance_response = indian_result
+    if response.status_code == 200:
+        result = response.json()
+        print(f"✅ SUCCESS - Processed Indian dataset")
+        print(f"\nFairness Score: {result['fairness_score']}")
+        print(f"Accuracy: {result['accuracy']}")
+        print(f"Disparate Impact: {result['details']['disparate_impact']}")
+        print(f"Demographic Parity: {result['details']['demographic_parity_difference']}")
+
+        # RBI compliance check run with this data
+        print("\n" + "-"*60)
+        print("Running RBI Compliance Check...")
+        print("-"*60)
+
+        if compliance_response.status_code == 200:
+            compliance = compliance_response.json()
+            print(f"\n📋 Overall Status: {compliance['overall_status']}")
+            print(f"🚨 Risk Level: {compliance['risk_level']}")
+
+            for check in compliance['compliance_checks']:
+                print(f"\n  ✓ {check['regulation']}:")
+                print(f"    Status: {check['status']}")
+                print(f"    {check['details']}")
+
+            if 'financial_impact' in compliance:
+                print(f"\n💰 Financial Impact:")
+                print(f"    Estimated Penalty: {compliance['financial_impact']['estimated_penalty']}")
+    else:
+        print(f"❌ Error: {response.status_code}")
+        print(response.text[:200])
 
 print("\n" + "="*80)
 print("ROBUSTNESS TESTING COMPLETE")